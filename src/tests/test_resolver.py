@@ -0,0 +1,48 @@
+import socket
+
+from unalix import config
+from unalix.core import resolver
+
+
+def test_dns_cache(monkeypatch):
+
+    lookups = []
+
+    def getaddrinfo(host, port, *args):
+        lookups.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+
+    resolver.clear_dns_cache()
+
+    # Repeated hosts are resolved only once
+    for _ in range(3):
+        assert resolver.getaddrinfo("example.com", 80) == [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 80))]
+
+    assert lookups == ["example.com"]
+
+    resolver.getaddrinfo("example.org", 80)
+
+    assert lookups == ["example.com", "example.org"]
+
+    # clear_dns_cache() removes all entries
+    resolver.clear_dns_cache()
+
+    assert resolver.dns_cache == {}
+
+    resolver.getaddrinfo("example.com", 80)
+
+    assert lookups == ["example.com", "example.org", "example.com"]
+
+    # Entries are not used after the TTL
+    monkeypatch.setattr(config, "HTTP_DNS_CACHE_TTL", 0)
+
+    resolver.clear_dns_cache()
+    resolver.getaddrinfo("example.com", 80)
+    resolver.getaddrinfo("example.com", 80)
+
+    assert lookups == ["example.com", "example.org", "example.com", "example.com", "example.com"]
+    assert len(resolver.dns_cache) == 1
+
+    resolver.clear_dns_cache()
@@ -1,4 +1,7 @@
+import json
+
 from unalix import clear_url
+from unalix.core import coreutils, url_cleaner
 
 def test_clear_url():
 
@@ -60,4 +63,36 @@ def test_clear_url():
     # https://github.com/AmanoTeam/Unalix-nim/issues/5
     unmodified_url = "https://docs.julialang.org/en/v1/stdlib/REPL/#Key-bindings"
     assert clear_url(unmodified_url) == unmodified_url
-    
\ No newline at end of file
+    
+
+
+def test_uncombinable_rules(tmp_path):
+
+    ruleset = tmp_path / "ruleset.json"
+    ruleset.write_text(
+        json.dumps(
+            {
+                "providers": {
+                    "example": {
+                        "urlPattern": "^https?://example\\.com",
+                        # Both rules compile on their own, but can't be combined into a single regex
+                        "rules": ["(?P<v>a)ref", "(?P<v>b)ref"],
+                        "referralMarketing": ["(x)y\\2"]
+                    }
+                }
+            }
+        )
+    )
+
+    rulesets = coreutils.rulesets_from_files([ruleset])
+    provider = next(rulesets.iter())
+
+    assert provider.rules.compiled is None
+    assert provider.referralMarketing.compiled is None
+
+    query = "aref=1&bref=2&xyx=3&keep=4"
+
+    query = url_cleaner.remove_fields(provider.rules, query)
+    query = url_cleaner.remove_fields(provider.referralMarketing, query)
+
+    assert query == "&&&keep=4"
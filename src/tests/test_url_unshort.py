@@ -1,8 +1,12 @@
 import asyncio
+import http.client
 import http.server
 import _thread as thread
 
+import pytest
+
 import unalix
+from unalix.core import connection_pool
 
 hostname = "127.0.0.1"
 port = 56885
@@ -23,12 +27,26 @@ class Server(http.server.BaseHTTPRequestHandler):
         elif self.path == "/relative-redirect":
             self.send_response(301)
             self.send_header("Location", "ok")
+        elif self.path == "/nested/dot-segment-redirect":
+            self.send_response(301)
+            self.send_header("Location", "../ok")
         elif self.path == "/root-redirect":
             self.send_response(301)
             self.send_header("Location", "/redirect-to-tracking")
         elif self.path == "/i-dont-know-its-name-redirect":
             self.send_response(301)
             self.send_header("Location", f"//{hostname}:{port}/redirect-to-tracking")
+        elif self.path == "/body-redirect":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(f"<script>redirecturl = 'http://{hostname}:{port}/redirect-to-tracking'</script>".encode())
+            return
+        elif self.path == "/loop-a":
+            self.send_response(301)
+            self.send_header("Location", "/loop-b")
+        elif self.path == "/loop-b":
+            self.send_response(301)
+            self.send_header("Location", "/loop-a")
 
         self.end_headers()
 
@@ -36,6 +54,51 @@ server = http.server.HTTPServer((hostname, port), Server)
 
 thread.start_new_thread(server.serve_forever, ())
 
+keepalive_port = 56886
+
+keepalive_base_url = f"http://{hostname}:{keepalive_port}"
+
+class KeepAliveServer(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # Client port of each request, in the order they were received
+    client_ports = []
+
+    def do_GET(self):
+        self.client_ports.append(self.client_address[1])
+
+        if self.path == "/ok":
+            self.send_response(200)
+        elif self.path == "/redirect-a":
+            self.send_response(301)
+            self.send_header("Location", "/redirect-b")
+        elif self.path == "/redirect-b":
+            self.send_response(301)
+            self.send_header("Location", "/ok")
+        elif self.path == "/truncated-redirect":
+            # Promise a longer body than the one actually sent
+            self.send_response(301)
+            self.send_header("Location", "/ok")
+            self.send_header("Content-Length", "100")
+            self.end_headers()
+            self.wfile.write(b"abc")
+            self.close_connection = True
+            return
+        elif self.path == "/close":
+            # Drop the connection without telling the client, as servers do with idle connections
+            self.send_response(200)
+            self.close_connection = True
+
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_HEAD = do_GET
+
+keepalive_server = http.server.ThreadingHTTPServer((hostname, keepalive_port), KeepAliveServer)
+
+thread.start_new_thread(keepalive_server.serve_forever, ())
+
 def test_unshort():
 
     event_policy = asyncio.get_event_loop_policy()
@@ -51,6 +114,11 @@ def test_unshort():
     assert unalix.unshort_url(unmodified_url) == f"{base_url}/ok"
     assert event_loop.run_until_complete(unalix.aunshort_url(unmodified_url)) == f"{base_url}/ok"
 
+    unmodified_url = f"{base_url}/nested/dot-segment-redirect"
+
+    assert unalix.unshort_url(unmodified_url) == f"{base_url}/ok"
+    assert event_loop.run_until_complete(unalix.aunshort_url(unmodified_url)) == f"{base_url}/ok"
+
     unmodified_url = f"{base_url}/root-redirect"
 
     assert unalix.unshort_url(unmodified_url) == f"{base_url}/ok"
@@ -61,5 +129,93 @@ def test_unshort():
     assert unalix.unshort_url(unmodified_url) == f"{base_url}/ok"
     assert event_loop.run_until_complete(unalix.aunshort_url(unmodified_url)) == f"{base_url}/ok"
 
+    unmodified_url = f"{base_url}/loop-a"
+
+    assert unalix.unshort_url(unmodified_url) == f"{base_url}/loop-a"
+    assert event_loop.run_until_complete(unalix.aunshort_url(unmodified_url)) == f"{base_url}/loop-a"
+
+    unmodified_url = f"{base_url}/body-redirect"
+
+    assert unalix.unshort_url(unmodified_url) == unmodified_url
+    assert unalix.unshort_url(unmodified_url, parse_documents=True) == f"{base_url}/ok"
+
+    unmodified_urls = [f"{base_url}/absolute-redirect", f"{base_url}/relative-redirect", f"{base_url}/loop-a"]
+    expected_urls = [f"{base_url}/ok", f"{base_url}/ok", f"{base_url}/loop-a"]
+
+    assert unalix.unshort_urls(unmodified_urls) == expected_urls
+    assert event_loop.run_until_complete(unalix.aunshort_urls(unmodified_urls, concurrency=2)) == expected_urls
+
     server.server_close()
 
+
+def test_unshort_urls_concurrency():
+
+    event_policy = asyncio.get_event_loop_policy()
+    event_loop = event_policy.new_event_loop()
+
+    unmodified_urls = [f"{base_url}/ok"]
+
+    with pytest.raises(ValueError):
+        unalix.unshort_urls(unmodified_urls, concurrency=0)
+
+    with pytest.raises(ValueError):
+        event_loop.run_until_complete(
+            asyncio.wait_for(unalix.aunshort_urls(unmodified_urls, concurrency=0), timeout=5)
+        )
+
+
+def test_connection_pool_limits():
+
+    connection = http.client.HTTPConnection(hostname, port)
+
+    # A limit of 0 disables pooling
+    pool = connection_pool.ConnectionPool(max_connections=0)
+    pool.put("key", connection)
+
+    assert pool.get("key") is None
+
+    pool = connection_pool.ConnectionPool(max_connections=1)
+    pool.put("key", connection)
+
+    assert pool.get("key") is connection
+    assert pool.get("key") is None
+
+    # Idle connections are not reused after the keep-alive expiry
+    pool = connection_pool.ConnectionPool(max_connections=1, keepalive_expiry=0)
+    pool.put("key", connection)
+
+    assert pool.get("key") is None
+
+
+def test_unshort_keepalive():
+
+    client_ports = KeepAliveServer.client_ports
+
+    connection_pool.SHARED_POOL.clear()
+
+    # All hops of a redirect chain are sent over the same connection
+    assert unalix.unshort_url(f"{keepalive_base_url}/redirect-a") == f"{keepalive_base_url}/ok"
+
+    assert len(client_ports) == 3
+    assert len(set(client_ports)) == 1
+
+    # The connection is kept in the shared pool and reused by later calls
+    assert unalix.unshort_url(f"{keepalive_base_url}/ok") == f"{keepalive_base_url}/ok"
+
+    assert len(client_ports) == 4
+    assert len(set(client_ports)) == 1
+
+    # A kept-alive connection closed by the server is replaced by a new one
+    assert unalix.unshort_url(f"{keepalive_base_url}/close") == f"{keepalive_base_url}/close"
+    assert unalix.unshort_url(f"{keepalive_base_url}/ok") == f"{keepalive_base_url}/ok"
+
+    assert len(client_ports) == 6
+    assert client_ports[4] == client_ports[0]
+    assert client_ports[5] != client_ports[0]
+
+    # Failing to drain a redirect body doesn't fail the lookup
+    assert unalix.unshort_url(f"{keepalive_base_url}/truncated-redirect") == f"{keepalive_base_url}/ok"
+    assert unalix.unshort_url(f"{keepalive_base_url}/truncated-redirect", method="HEAD") == f"{keepalive_base_url}/ok"
+
+    connection_pool.SHARED_POOL.clear()
+    keepalive_server.server_close()
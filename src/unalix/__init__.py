@@ -27,13 +27,13 @@
     If something goes wrong, please open a issue at GitHub.
 """
 from .core.url_cleaner import clear_url
-from .core.url_unshort import unshort_url, aunshort_url
+from .core.url_unshort import unshort_url, aunshort_url, unshort_urls, aunshort_urls
 from .core.cookie_policies import (
     COOKIE_REJECT_ALL,
     COOKIE_ALLOW_ALL,
     COOKIE_STRICT_ALLOW
 )
-from .core.ssl_context import SSL_CONTEXT_VERIFIED, SSL_CONTEXT_UNVERIFIED
+from .core import ssl_context as __ssl_context
 from .__version__ import __description__, __title__, __version__
 from .exceptions import (
     UnsupportedProtocolError,
@@ -50,6 +50,8 @@ __all__ = [
     "clear_url",
     "unshort_url",
     "aunshort_url",
+    "unshort_urls",
+    "aunshort_urls",
     "UnsupportedProtocolError",
     "ConnectError",
     "TooManyRedirectsError",
@@ -67,6 +69,15 @@ for __name in __all__:
     if not __name.startswith("__"):
         try:
             setattr(__locals[__name], "__module__", "unalix")
-        except AttributeError:
+        except (AttributeError, KeyError):
             pass
 
+
+# SSL contexts are only created when they are first accessed (see unalix.core.ssl_context)
+def __getattr__(name):
+
+    if name in ("SSL_CONTEXT_VERIFIED", "SSL_CONTEXT_UNVERIFIED"):
+        return getattr(__ssl_context, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -12,8 +12,13 @@ from .http import (
     HTTP_MAX_FETCH_SIZE,
     HTTP_STATUS_RETRY,
     HTTP_MAX_RETRIES,
+    HTTP_MAX_CONCURRENCY,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
     HTTP_STATUS_REDIRECT,
-    HTTP_METHOD
+    HTTP_METHOD,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_DNS_CACHE_SIZE
 )
 from .rulesets import IGNORED_PROVIDERS
 
@@ -30,7 +35,12 @@ __all__ = [
     "HTTP_STATUS_RETRY",
     "HTTP_STATUS_REDIRECT",
     "HTTP_MAX_RETRIES",
+    "HTTP_MAX_CONCURRENCY",
+    "HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    "HTTP_KEEPALIVE_EXPIRY",
     "HTTP_METHOD",
+    "HTTP_DNS_CACHE_TTL",
+    "HTTP_DNS_CACHE_SIZE",
     "IGNORED_PROVIDERS"
 ]
 
@@ -6,7 +6,7 @@ from .. import __version__
 HTTP_HEADERS = {
     "Accept": "*/*",
     "Accept-Encoding": "identity",
-    "Connection": "close",
+    "Connection": "keep-alive",
     "User-Agent": f"{__version__.__title__}/{__version__.__version__} (+{__version__.__homepage__})"
 }
 
@@ -20,6 +20,16 @@ HTTP_MAX_FETCH_SIZE = 5120
 
 HTTP_MAX_RETRIES = 0
 
+HTTP_MAX_CONCURRENCY = 50
+
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+
+HTTP_KEEPALIVE_EXPIRY = 5
+
+HTTP_DNS_CACHE_TTL = 300
+
+HTTP_DNS_CACHE_SIZE = 256
+
 HTTP_STATUS_RETRY = (
     http.HTTPStatus.TOO_MANY_REQUESTS,
     http.HTTPStatus.INTERNAL_SERVER_ERROR,
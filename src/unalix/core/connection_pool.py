@@ -0,0 +1,120 @@
+import http.client
+import threading
+import time
+import typing
+
+from .. import config
+
+
+class ConnectionPool:
+    """
+    Keeps idle keep-alive connections around, so that later requests to the same host can reuse them
+    instead of opening a new connection (and doing a new TCP and TLS handshake).
+
+    Connections are shared between calls (and threads); the oldest ones are closed once the pool is full,
+    and connections that stayed idle for too long are closed instead of being reused.
+
+    Unless given explicitly, the limits are read from config.HTTP_MAX_KEEPALIVE_CONNECTIONS and
+    config.HTTP_KEEPALIVE_EXPIRY on every call, so changing them takes effect immediately.
+    """
+
+
+    def __init__(
+        self,
+        max_connections: typing.Optional[int] = None,
+        keepalive_expiry: typing.Optional[float] = None
+    ):
+
+        self.max_connections = max_connections
+        self.keepalive_expiry = keepalive_expiry
+
+        # Idle connections as (key, connection, idle_since) tuples, oldest first
+        self.connections = []
+
+        self.lock = threading.Lock()
+
+
+    def get(self, key: typing.Hashable) -> typing.Optional[http.client.HTTPConnection]:
+        """
+        Take the most recently used idle connection for the given key out of the pool, if there is any.
+        """
+
+        with self.lock:
+            expired_connections = self.remove_expired()
+
+            for index in range(len(self.connections) - 1, -1, -1):
+                if self.connections[index][0] == key:
+                    connection = self.connections.pop(index)[1]
+                    break
+            else:
+                connection = None
+
+        for key, expired_connection, idle_since in expired_connections:
+            expired_connection.close()
+
+        return connection
+
+
+    def put(self, key: typing.Hashable, connection: http.client.HTTPConnection) -> None:
+        """
+        Put an idle connection back into the pool.
+        """
+
+        max_connections = (
+            self.max_connections if self.max_connections is not None else config.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
+
+        with self.lock:
+            evicted_connections = self.remove_expired()
+
+            self.connections.append((key, connection, time.monotonic()))
+
+            # With a limit of 0, the connection is closed right away
+            excess = max(len(self.connections) - max_connections, 0)
+
+            evicted_connections += self.connections[:excess]
+            del self.connections[:excess]
+
+        for key, connection, idle_since in evicted_connections:
+            connection.close()
+
+
+    def clear(self) -> None:
+        """
+        Close all idle connections.
+        """
+
+        with self.lock:
+            connections, self.connections = self.connections, []
+
+        for key, connection, idle_since in connections:
+            connection.close()
+
+
+    def remove_expired(self) -> list:
+        """
+        Remove connections that have been idle for longer than the keep-alive expiry and return them.
+
+        Must be called with the lock held; closing the returned connections is up to the caller.
+        """
+
+        keepalive_expiry = (
+            self.keepalive_expiry if self.keepalive_expiry is not None else config.HTTP_KEEPALIVE_EXPIRY
+        )
+
+        expires_before = time.monotonic() - keepalive_expiry
+
+        # Connections are ordered by the time they became idle
+        index = 0
+
+        while index < len(self.connections) and self.connections[index][2] <= expires_before:
+            index += 1
+
+        expired_connections = self.connections[:index]
+        del self.connections[:index]
+
+        return expired_connections
+
+
+# Shared by all unshort_url() calls
+SHARED_POOL = ConnectionPool()
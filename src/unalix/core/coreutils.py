@@ -4,8 +4,17 @@ import typing
 import ssl
 import sys
 
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    # Python 3.10 and earlier
+    import sre_parse
+
 from .. import types
 
+# Numbered or named backreferences inside a regex pattern
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
 
 def rulesets_from_files(iterable_of_paths: typing.Iterable, ignored_providers: typing.Optional[typing.Iterable] = None) -> types.Rulesets:
 
@@ -21,66 +30,73 @@ def rulesets_from_files(iterable_of_paths: typing.Iterable, ignored_providers: t
 
     for ruleset in iterable_of_dicts:
 
-        for providerName in ruleset["providers"].keys():
+        for providerName, provider in ruleset["providers"].items():
 
             if ignored_providers is not None and providerName in ignored_providers:
                 continue
 
             # https://docs.clearurls.xyz/latest/specs/rules/#urlpattern
-            urlPattern = types.Pattern(ruleset["providers"][providerName]["urlPattern"])
-            urlPattern.compiled = re.compile(urlPattern)
+            urlPattern = types.Pattern(provider["urlPattern"])
+            urlPattern.literal = get_required_literal(urlPattern)
 
             # https://docs.clearurls.xyz/latest/specs/rules/#completeprovider
-            completeProvider = ruleset["providers"][providerName].get("completeProvider", False)
+            completeProvider = provider.get("completeProvider", False)
 
             # https://docs.clearurls.xyz/latest/specs/rules/#rules
             rules = types.Patterns()
 
-            for rule in ruleset["providers"][providerName].get("rules", []):
+            for rule in provider.get("rules", []):
                 pattern = types.Pattern(rule)
-                pattern.compiled = re.compile(rf"(%(?:26|23)|&|^){rule}(?:(?:=|%3[Dd])[^&]*)")
+                pattern.regex = rf"(%(?:26|23)|&|^){rule}(?:(?:=|%3[Dd])[^&]*)"
 
                 rules.append(pattern)
 
+            # All rules combined into a single pattern, so that the query is scanned only once
+            rules.regex = combine_query_patterns(rules)
+
             # https://docs.clearurls.xyz/latest/specs/rules/#rawrules
             rawRules = types.Patterns()
 
-            for rawRule in ruleset["providers"][providerName].get("rawRules", []):
+            for rawRule in provider.get("rawRules", []):
                 pattern = types.Pattern(rawRule)
-                pattern.compiled = re.compile(rawRule)
-
                 rawRules.append(pattern)
 
+            rawRules.regex = combine_alternatives(rawRules)
+
             # https://docs.clearurls.xyz/latest/specs/rules/#referralmarketing
             referralMarketing = types.Patterns()
 
-            for referral in ruleset["providers"][providerName].get("referralMarketing", []):
+            for referral in provider.get("referralMarketing", []):
                 pattern = types.Pattern(referral)
-                pattern.compiled = re.compile(rf"(%(?:26|23)|&|^){referral}(?:(?:=|%3[Dd])[^&]*)")
+                pattern.regex = rf"(%(?:26|23)|&|^){referral}(?:(?:=|%3[Dd])[^&]*)"
 
                 referralMarketing.append(pattern)
 
+            referralMarketing.regex = combine_query_patterns(referralMarketing)
+
             # https://docs.clearurls.xyz/latest/specs/rules/#exceptions
             exceptions = types.Patterns()
 
-            for exception in ruleset["providers"][providerName].get("exceptions", []):
+            for exception in provider.get("exceptions", []):
                 pattern = types.Pattern(exception)
-                pattern.compiled = re.compile(exception)
-
                 exceptions.append(pattern)
 
+            exceptions.regex = combine_alternatives(exceptions)
+
             # https://docs.clearurls.xyz/latest/specs/rules/#redirections
             redirections = types.Patterns()
 
-            for redirection in ruleset["providers"][providerName].get("redirections", []):
+            for redirection in provider.get("redirections", []):
                 pattern = types.Pattern(redirection)
-                pattern.compiled = re.compile(f"{redirection}.*")
+                pattern.regex = f"{redirection}.*"
 
                 redirections.append(pattern)
 
+            redirections.regex = combine_alternatives(redirections)
+
             # https://docs.clearurls.xyz/latest/specs/rules/#forceredirection
             # This field is ignored by Unalix, we are leaving it here just as reference
-            forceRedirection = ruleset["providers"][providerName].get("forceRedirection", False)
+            forceRedirection = provider.get("forceRedirection", False)
 
             rulesets.add_ruleset(
                 types.Ruleset(
@@ -99,6 +115,83 @@ def rulesets_from_files(iterable_of_paths: typing.Iterable, ignored_providers: t
     return rulesets
 
 
+def get_required_literal(pattern: str) -> typing.Optional[str]:
+    """
+    Return the longest piece of text that any string matched by the given regex pattern must contain
+    (e.g. "amazon" for "^https?:\\/\\/(?:[a-z0-9-]+\\.)*?amazon(?:\\.[a-z]{2,}){1,}").
+
+    Returns None if no such text could be found.
+    """
+
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+
+    # Python 3.8 renamed SubPattern.pattern to SubPattern.state
+    state = parsed.state if hasattr(parsed, "state") else parsed.pattern
+
+    if state.flags & re.IGNORECASE:
+        return None
+
+    literals = []
+    current = ""
+
+    # Only literals at the top level are mandatory; anything inside groups, branches
+    # or repetitions might not be part of the match.
+    for opcode, argument in parsed:
+        if opcode is sre_parse.LITERAL:
+            current += chr(argument)
+        else:
+            literals.append(current)
+            current = ""
+
+    literals.append(current)
+
+    return max(literals, key=len) or None
+
+
+def combine_query_patterns(patterns: types.Patterns) -> typing.Optional[str]:
+    """
+    Combine a list of query field names into a single regex matching any of them.
+
+    Returns None if the list is empty or if the patterns can't be combined (e.g. they use backreferences,
+    which would end up pointing to the wrong groups).
+    """
+
+    if not patterns:
+        return None
+
+    if any(BACKREFERENCE.search(pattern) for pattern in patterns.iter()):
+        return None
+
+    alternatives = "|".join(f"(?:{pattern})" for pattern in patterns.iter())
+
+    return rf"(%(?:26|23)|&|^)(?:{alternatives})(?:(?:=|%3[Dd])[^&]*)"
+
+
+def combine_alternatives(patterns: types.Patterns) -> typing.Optional[str]:
+    """
+    Combine a list of patterns into a single regex that matches wherever any of them matches.
+
+    This is meant to be used as a prefilter: a single search tells whether any of the patterns needs to be applied at all.
+
+    Returns None if the list is empty or if the patterns can't be combined (e.g. they use backreferences,
+    which would end up pointing to the wrong groups).
+    """
+
+    if not patterns:
+        return None
+
+    sources = [pattern.regex for pattern in patterns.iter()]
+
+    if any(BACKREFERENCE.search(source) for source in sources):
+        return None
+
+    # Patterns that can't be compiled once combined (e.g. because of inline flags) are handled by types.Patterns
+    return "|".join(f"(?:{source})" for source in sources)
+
+
 def domains_from_files(iterable_of_paths: typing.Iterable) -> types.Domains:
 
     domains = types.Domains()
@@ -135,7 +228,6 @@ def body_redirects_from_files(iterable_of_paths: typing.Iterable) -> types.BodyR
                 urlPattern = None
             else:
                 urlPattern = types.Pattern(ruleset["urlPattern"])
-                urlPattern.compiled = re.compile(urlPattern)
 
             domains = types.Domains(ruleset["domains"])
 
@@ -143,10 +235,11 @@ def body_redirects_from_files(iterable_of_paths: typing.Iterable) -> types.BodyR
 
             for rule in ruleset["rules"]:
                 pattern = types.Pattern(rule)
-                pattern.compiled = re.compile(rule)
 
                 rules.append(pattern)
 
+            rules.regex = combine_alternatives(rules)
+
             body_redirects.add_ruleset(
                 types.BodyRedirect(
                     providerName=providerName,
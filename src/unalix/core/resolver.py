@@ -0,0 +1,96 @@
+import socket
+import threading
+import time
+import typing
+
+from .. import config
+
+
+# Resolved addresses as {(host, port, family, type, proto, flags): (expires_at, addresses)} pairs
+dns_cache = {}
+
+# unshort_urls() resolves hosts from multiple threads at once
+dns_cache_lock = threading.Lock()
+
+
+def getaddrinfo(
+    host: str,
+    port: int,
+    family: typing.Optional[int] = 0,
+    type: typing.Optional[int] = 0,
+    proto: typing.Optional[int] = 0,
+    flags: typing.Optional[int] = 0
+) -> typing.List[tuple]:
+    """
+    Same as socket.getaddrinfo(), but results are cached for config.HTTP_DNS_CACHE_TTL seconds.
+    """
+
+    key = (host, port, family, type, proto, flags)
+    now = time.monotonic()
+
+    with dns_cache_lock:
+        try:
+            expires_at, addresses = dns_cache[key]
+        except KeyError:
+            pass
+        else:
+            if expires_at > now:
+                return addresses
+
+    # The lookup itself is done without holding the lock, so that slow resolutions don't block other threads
+    addresses = socket.getaddrinfo(host, port, family, type, proto, flags)
+
+    with dns_cache_lock:
+        # An expired entry for the same key is replaced instead of evicting another one
+        dns_cache.pop(key, None)
+
+        # Evict the oldest entry when the cache is full
+        if dns_cache and len(dns_cache) >= config.HTTP_DNS_CACHE_SIZE:
+            dns_cache.pop(next(iter(dns_cache)))
+
+        dns_cache[key] = (now + config.HTTP_DNS_CACHE_TTL, addresses)
+
+    return addresses
+
+
+# https://github.com/python/cpython/blob/v3.9.0/Lib/socket.py#L790
+def create_connection(
+    address: typing.Tuple[str, int],
+    timeout: typing.Optional[float] = socket._GLOBAL_DEFAULT_TIMEOUT,
+    source_address: typing.Optional[typing.Tuple[str, int]] = None
+) -> socket.socket:
+    """
+    Same as socket.create_connection(), but looks up the host address using the cached getaddrinfo().
+    """
+
+    host, port = address
+    error = None
+
+    for family, socktype, proto, canonname, sockaddr in getaddrinfo(host, port, 0, socket.SOCK_STREAM):
+        sock = None
+        try:
+            sock = socket.socket(family, socktype, proto)
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as exception:
+            error = exception
+            if sock is not None:
+                sock.close()
+
+    if error is not None:
+        raise error
+
+    raise OSError("getaddrinfo returns an empty list")
+
+
+def clear_dns_cache() -> None:
+    """
+    Remove all cached DNS resolutions.
+    """
+
+    with dns_cache_lock:
+        dns_cache.clear()
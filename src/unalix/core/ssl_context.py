@@ -1,14 +1,32 @@
+import functools
+import ssl
+import typing
+
 from .. import config
 from . import coreutils
 
 
-# Default SSL context for HTTPS connections.
-SSL_CONTEXT_VERIFIED = coreutils.create_ssl_context(
-    cert_file=config.PATH_CA_BUNDLE
-)
+@functools.lru_cache(maxsize=None)
+def get_ssl_context(unverified: typing.Optional[bool] = False) -> ssl.SSLContext:
+    """
+    Return the default SSL context for HTTPS connections, creating it on first use.
+
+    Loading the CA bundle is expensive, and plain HTTP requests never need it.
+    """
+
+    return coreutils.create_ssl_context(
+        unverified=unverified,
+        cert_file=config.PATH_CA_BUNDLE
+    )
+
+
+# SSL_CONTEXT_VERIFIED and SSL_CONTEXT_UNVERIFIED are only created when they are first accessed
+def __getattr__(name: str) -> ssl.SSLContext:
+
+    if name == "SSL_CONTEXT_VERIFIED":
+        return get_ssl_context()
 
-SSL_CONTEXT_UNVERIFIED = coreutils.create_ssl_context(
-    unverified=True,
-    cert_file=config.PATH_CA_BUNDLE
-)
+    if name == "SSL_CONTEXT_UNVERIFIED":
+        return get_ssl_context(unverified=True)
 
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,4 @@
+import functools
 import typing
 import urllib.parse
 
@@ -13,6 +14,44 @@ rulesets = coreutils.rulesets_from_files(
     ignored_providers=config.IGNORED_PROVIDERS
 )
 
+# Rules and referral marketing fields can only match URLs with a query or fragment; for
+# all other URLs, only rulesets with redirections or raw rules can make any difference
+rulesets_without_fields = types.Rulesets(
+    [ruleset for ruleset in rulesets.iter() if ruleset.redirections or ruleset.rawRules]
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def get_candidate_rulesets(origin: str, has_fields: bool) -> typing.Tuple[types.Ruleset, ...]:
+    """
+    Return the rulesets whose urlPattern might match the given "scheme://netloc" string, in their original order.
+
+    Rulesets are discarded when their urlPattern requires a piece of text that is not present in the origin,
+    so the (much more expensive) regex match only has to be done for a handful of them.
+    """
+
+    return tuple(
+        ruleset for ruleset in (rulesets if has_fields else rulesets_without_fields).iter()
+        if ruleset.urlPattern.literal is None or ruleset.urlPattern.literal in origin
+    )
+
+
+def remove_fields(patterns: types.Patterns, query: str) -> str:
+    """
+    Remove all fields matching the given rules (or referral marketing fields) from a query string.
+
+    The combined regex is used whenever possible; the rules are applied one by one if they couldn't be combined.
+    """
+
+    if patterns.compiled is not None:
+        return patterns.compiled.sub(r"\g<1>", query)
+
+    for pattern in patterns:
+        query = pattern.compiled.sub(r"\g<1>", query)
+
+    return query
+
+
 def clear_url(
     url: typing.Union[str, urllib.parse.ParseResult],
     ignoreReferralMarketing: typing.Optional[bool] = False,
@@ -107,22 +146,34 @@ def clear_url(
             'https://natura.com.br/p/2458'
     """
 
-    for ruleset in rulesets.iter():
+    if isinstance(url, types.URL_TYPES):
+        url = types.URL(url.geturl())
+    else:
+        url = types.URL(url)
+
+    if skipLocal and url.islocal():
+        return url
+
+    # Rulesets work on the normalized URL; it's only parsed again if normalizing actually changed it
+    normalized_url = url.geturl()
+
+    if normalized_url != url:
+        url = types.URL(normalized_url)
+
+    # Rulesets never modify the scheme or the host, so this stays the same for all of them
+    origin = f"{url.scheme}://{url.netloc}"
 
-        if isinstance(url, types.URL_TYPES):
-            url = types.URL(url.geturl())
-        else:
-            url = types.URL(url)
+    # Rulesets never add fields to the URL, so this won't change while they are being processed
+    has_fields = bool(url.query or url.fragment)
 
-        if skipLocal and url.islocal():
-            return url
+    for ruleset in get_candidate_rulesets(origin, has_fields):
 
         if skipBlocked and ruleset.completeProvider:
             continue
 
         # https://docs.clearurls.xyz/latest/specs/rules/#urlpattern
-        if ruleset.urlPattern.compiled.match(f"{url.scheme}://{url.netloc}"):
-            if not ignoreExceptions:
+        if ruleset.urlPattern.compiled.match(origin):
+            if not ignoreExceptions and (ruleset.exceptions.compiled is None or ruleset.exceptions.compiled.match(url)):
                 exception_matched = None
                 # https://docs.clearurls.xyz/latest/specs/rules/#exceptions
                 for exception in ruleset.exceptions.iter():
@@ -132,7 +183,7 @@ def clear_url(
                 if exception_matched:
                     continue
 
-            if not ignoreRedirections:
+            if not ignoreRedirections and (ruleset.redirections.compiled is None or ruleset.redirections.compiled.search(url)):
                 # https://docs.clearurls.xyz/latest/specs/rules/#redirections
                 for redirection in ruleset.redirections:
                     result = redirection.compiled.sub(r"\g<1>", url)
@@ -163,33 +214,30 @@ def clear_url(
                     )
 
             if url.query:
-                if not ignoreRules:
+                if not ignoreRules and ruleset.rules:
                     # https://docs.clearurls.xyz/latest/specs/rules/#rules
-                    for rule in ruleset.rules:
-                        url.query = rule.compiled.sub(r"\g<1>", url.query)
-                if not ignoreReferralMarketing:
+                    url.query = remove_fields(ruleset.rules, url.query)
+                if not ignoreReferralMarketing and ruleset.referralMarketing:
                     # https://docs.clearurls.xyz/latest/specs/rules/#referralmarketing
-                    for referral in ruleset.referralMarketing:
-                        url.query = referral.compiled.sub(r"\g<1>", url.query)
+                    url.query = remove_fields(ruleset.referralMarketing, url.query)
 
             # The fragment might contains tracking fields as well
             if url.fragment:
-                if not ignoreRules:
-                    for rule in ruleset.rules:
-                        url.fragment = rule.compiled.sub(r"\g<1>", url.fragment)
-                if not ignoreReferralMarketing:
-                    for referral in ruleset.referralMarketing:
-                        url.fragment = referral.compiled.sub(r"\g<1>", url.fragment)
+                if not ignoreRules and ruleset.rules:
+                    url.fragment = remove_fields(ruleset.rules, url.fragment)
+                if not ignoreReferralMarketing and ruleset.referralMarketing:
+                    url.fragment = remove_fields(ruleset.referralMarketing, url.fragment)
 
             if url.path:
-                if not ignoreRawRules:
+                if not ignoreRawRules and (ruleset.rawRules.compiled is None or ruleset.rawRules.compiled.search(url.path)):
                     # https://docs.clearurls.xyz/latest/specs/rules/#rawrules
                     for rawRule in ruleset.rawRules:
                         url.path = rawRule.compiled.sub("", url.path)
 
-        url = url.geturl()
+            modified_url = url.geturl()
 
-    url = types.URL(url)
+            if modified_url != url:
+                url = types.URL(modified_url)
 
     if url.query:
         url.query = utils.filter_query(
@@ -1,4 +1,5 @@
 import asyncio
+import concurrent.futures
 import typing
 import http
 import http.cookiejar
@@ -8,7 +9,6 @@ import html
 import urllib.parse
 import time
 import datetime
-import os
 
 from .. import types
 from .. import config
@@ -18,9 +18,46 @@ from . import cookie_policies
 from . import ssl_context
 from . import url_cleaner
 from . import coreutils
+from . import resolver
+from . import connection_pool
 
 body_redirects = coreutils.body_redirects_from_files(config.PATH_BODY_REDIRECTS)
 
+
+def extract_url(url: types.URL, content: str) -> typing.Optional[str]:
+    """
+    Look for a redirect URL in the given response body. Returns None if there is none.
+    """
+
+    for ruleset in body_redirects.iter():
+
+        if not (ruleset.urlPattern is not None and ruleset.urlPattern.compiled.match(url) or url.netloc in ruleset.domains):
+            continue
+
+        # A single scan tells whether any of the rules matches the document at all
+        if ruleset.rules.compiled is not None and ruleset.rules.compiled.search(content) is None:
+            continue
+
+        for rule in ruleset.rules.iter():
+            results = rule.compiled.search(content)
+            if results is not None:
+                return results.group(1)
+
+    return None
+
+
+def get_concurrency(concurrency: typing.Optional[int] = None) -> int:
+    """
+    Return the max number of URLs to resolve at the same time, falling back to config.HTTP_MAX_CONCURRENCY.
+    """
+
+    concurrency = concurrency if concurrency is not None else config.HTTP_MAX_CONCURRENCY
+
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency!r}")
+
+    return concurrency
+
 def unshort_url(
     url: typing.Union[str, urllib.parse.ParseResult],
     method: typing.Optional[str] = None,
@@ -136,6 +173,12 @@ def unshort_url(
     total_redirects = 0
     total_retries = 0
 
+    # Redirects already followed, as (URL, redirect location) pairs
+    followed_redirects = set()
+
+    # Cleaned redirect locations, as {"redirect location": "cleaned URL"} pairs
+    cleaned_urls = {}
+
     # HTTP options
     (
         http_method,
@@ -155,36 +198,66 @@ def unshort_url(
         max_fetch_size if max_fetch_size is not None else config.HTTP_MAX_FETCH_SIZE
     )
 
-    # SSL context for HTTPS requests
-    tls_context = (
-        context if context is not None else ssl_context.SSL_CONTEXT_VERIFIED
-    )
+    # SSL context for HTTPS requests (None means the default one, which is only created when needed)
+    tls_context = context
 
-    while True:
+    def release_connection(connection, response, key):
+        # A connection can only be reused after the previous response has been fully consumed.
+        # We only drain small bodies; anything else is cheaper to discard along with the socket.
+        if response.will_close or response.length is None or response.length > http_max_fetch:
+            connection.close()
+            return
 
-        if isinstance(url, types.URL_TYPES):
-            url = types.URL(url.geturl())
+        # A body that is truncated or too slow to arrive only means the connection can't be reused
+        try:
+            response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
         else:
-            url = types.URL(url)
+            connection_pool.SHARED_POOL.put(key, connection)
 
-        if url.scheme == "http":
-            connection = http.client.HTTPConnection(
-                host=url.netloc,
-                port=url.port,
-                timeout=http_timeout
-            )
-        elif url.scheme == "https":
-            connection = http.client.HTTPSConnection(
-                host=url.netloc,
-                port=url.port,
-                timeout=http_timeout,
-                context=tls_context
-            )
-        else:
-            raise exceptions.UnsupportedProtocolError(
-                message="Unrecognized URI or unsupported protocol",
-                url=url
-            ) from None
+    # The URL is parsed only once per hop; it's reused as is when retrying
+    if isinstance(url, types.URL_TYPES):
+        url = types.URL(url.geturl())
+    else:
+        url = types.URL(url)
+
+    # Set after a kept-alive connection fails, so that the request is retried over a new connection
+    redial = False
+
+    while True:
+
+        # Connections can only be reused by requests with the same host and connection settings
+        connection_key = (url.scheme, url.netloc, url.port, http_timeout, tls_context)
+
+        # Reuse a kept-alive connection from a previous request to the same host, if any
+        connection = None if redial else connection_pool.SHARED_POOL.get(connection_key)
+        is_reused_connection = connection is not None
+
+        redial = False
+
+        if connection is None:
+            if url.scheme == "http":
+                connection = http.client.HTTPConnection(
+                    host=url.netloc,
+                    port=url.port,
+                    timeout=http_timeout
+                )
+            elif url.scheme == "https":
+                connection = http.client.HTTPSConnection(
+                    host=url.netloc,
+                    port=url.port,
+                    timeout=http_timeout,
+                    context=tls_context if tls_context is not None else ssl_context.get_ssl_context()
+                )
+            else:
+                raise exceptions.UnsupportedProtocolError(
+                    message="Unrecognized URI or unsupported protocol",
+                    url=url
+                ) from None
+
+        # Resolve host addresses through our DNS cache, as redirect chains tend to visit the same hosts
+        connection._create_connection = resolver.create_connection
 
         # Workaround for making http.client's connection objects compatible with
         # CookieJar's extract_cookies() and add_cookie_header() methods.
@@ -210,9 +283,12 @@ def unshort_url(
 
         cookie_jar.add_cookie_header(connection)
 
-        # Merge headers added by cookie_jar.add_cookie_header() with default headers
-        connection_headers = dict(http_headers)
-        connection_headers.update(connection.headers)
+        # Merge headers added by cookie_jar.add_cookie_header() with default headers.
+        # Most requests carry no cookies, so there is usually nothing to merge.
+        if connection.headers:
+            connection_headers = {**http_headers, **connection.headers}
+        else:
+            connection_headers = http_headers
 
         uri = f"{url.path}?{url.query}" if url.query else url.path
 
@@ -225,6 +301,12 @@ def unshort_url(
             response = connection.getresponse()
         except Exception as exception:
             connection.close()
+
+            # The server (or anything in between) might have dropped an idle keep-alive connection in the
+            # meantime, which can surface as pretty much any error. Dial a new one before treating this as a connection error.
+            if is_reused_connection:
+                redial = True
+                continue
             
             # Retry based on connection error
             if http_max_retries > 0:
@@ -245,6 +327,8 @@ def unshort_url(
         else:
             # Retry based on status code
             if http_max_retries > 0 and response.code in http_status_retry:
+                release_connection(connection, response, connection_key)
+
                 retry_after = response.headers.get("Retry-After")
                 if retry_after is not None:
                     if retry_after.isnumeric():
@@ -276,34 +360,32 @@ def unshort_url(
             redirect_location = response.headers.get("Content-Location")
 
         if redirect_location is not None:
-            # https://stackoverflow.com/a/27357138
-            utils.requote_uri(
-                redirect_location.encode(encoding="latin1").decode(encoding='utf-8')
-            )
+            # Response body is ignored in redirects
+            release_connection(connection, response, connection_key)
 
+            # Resolve relative redirects (e.g. "//host/path", "/path" or "path") against the current URL
             if not redirect_location.startswith(("http://", "https://")):
-                if redirect_location.startswith("//"):
-                    # new url
-                    redirect_location = urllib.parse.urlunparse((url.scheme, redirect_location.lstrip("/"), "", "", "", ""))
-                elif redirect_location.startswith("/"):
-                    # full path
-                    redirect_location = urllib.parse.urlunparse((url.scheme, (url.netloc if url.port in (80, 443) else f"{url.netloc}:{url.port}") , redirect_location, "", "", ""))
-                else:
-                    # relative path
-                    path = os.path.join(os.path.dirname(url.path), redirect_location)
-                    redirect_location = urllib.parse.urlunparse((url.scheme, (url.netloc if url.port in (80, 443) else f"{url.netloc}:{url.port}"), path, "", "", ""))
+                redirect_location = urllib.parse.urljoin(url.geturl(), redirect_location)
 
             # Avoid redirect loops
             if redirect_location == url:
                 return url
 
+            # Following the same redirect twice means we are going in circles (e.g. A -> B -> A -> B)
+            redirect = (url, redirect_location)
+
+            if redirect in followed_redirects:
+                return url
+
+            followed_redirects.add(redirect)
+
             total_redirects += 1
 
             # Strip tracking fields from the redirect URL
-            url = url_cleaner.clear_url(url=redirect_location, **kwargs)
-
-            # Response body is ignored in redirects
-            connection.close()
+            try:
+                url = cleaned_urls[redirect_location]
+            except KeyError:
+                url = cleaned_urls[redirect_location] = types.URL(url_cleaner.clear_url(url=redirect_location, **kwargs))
 
             if total_redirects > http_max_redirects:
                 raise exceptions.TooManyRedirectsError(
@@ -314,10 +396,10 @@ def unshort_url(
             continue
 
         if parse_documents and http_method != "HEAD":
-            content = response.read(max_fetch_size)
+            content = response.read(http_max_fetch)
 
-            # Close connection after reading response body
-            connection.close()
+            # Release connection after reading response body
+            release_connection(connection, response, connection_key)
 
             # Get encoding from Content-Type header
             encoding = utils.get_encoding_from_headers(response.headers)
@@ -325,32 +407,26 @@ def unshort_url(
             # Try to decode the response body using the value returned by "get_encoding_from_headers" or "utf-8" as encoding
             decoded_content = content.decode(encoding=(encoding or "utf-8"), errors="ignore")
 
-            for ruleset in body_redirects.iter():
-
-                if (ruleset.urlPattern is not None and ruleset.urlPattern.compiled.match(url) or url.netloc in ruleset.domains):
-                    for rule in ruleset.rules.iter():
-                        results = rule.compiled.search(decoded_content)
-                        if isinstance(results, typing.Match):
-                            break
-                    else:
-                        continue
+            extracted_url = extract_url(url=url, content=decoded_content)
 
-                    # Strip tracking fields from the extracted URL
-                    url = url_cleaner.clear_url(url=utils.requote_uri(html.unescape(results.group(1))), **kwargs)
+            if extracted_url is None:
+                return url
 
-                    total_redirects += 1
+            # Strip tracking fields from the extracted URL
+            url = types.URL(url_cleaner.clear_url(url=utils.requote_uri(html.unescape(extracted_url)), **kwargs))
 
-                    if total_redirects > http_max_redirects:
-                        raise exceptions.TooManyRedirectsError(
-                            message="Exceeded maximum allowed redirects",
-                            url=url
-                        ) from None
+            total_redirects += 1
 
-                    break
-            else:
-                return url
-            
+            if total_redirects > http_max_redirects:
+                raise exceptions.TooManyRedirectsError(
+                    message="Exceeded maximum allowed redirects",
+                    url=url
+                ) from None
+        
             continue
+        elif response.length == 0 and not response.will_close:
+            # Keep the connection around for later calls, but only if there is no body left to wait for
+            release_connection(connection, response, connection_key)
         else:
             connection.close()
 
@@ -429,11 +505,9 @@ async def aunshort_url(
             >>> 
             >>> import unalix
             >>> 
-            >>> loop = asyncio.get_event_loop()
-            >>> 
             >>> url = "https://bitly.is/Pricing-Pop-Up'
             >>> 
-            >>> loop.run_until_complete(unalix.aunshort_url(url, cookies_policy=unalix.COOKIE_REJECT_ALL))
+            >>> asyncio.run(unalix.aunshort_url(url, cookies_policy=unalix.COOKIE_REJECT_ALL))
             'https://bitly.com/pages/pricing'
 
       Allowing all cookies
@@ -442,11 +516,9 @@ async def aunshort_url(
             >>> 
             >>> import unalix
             >>> 
-            >>> loop = asyncio.get_event_loop()
-            >>> 
             >>> url = "https://bitly.is/Pricing-Pop-Up'
             >>> 
-            >>> loop.run_until_complete(unalix.aunshort_url(url, cookies_policy=unalix.COOKIE_ALLOW_ALL))
+            >>> asyncio.run(unalix.aunshort_url(url, cookies_policy=unalix.COOKIE_ALLOW_ALL))
             'https://bitly.com/pages/pricing'
 
       Disabling SSL certificate validation
@@ -455,17 +527,21 @@ async def aunshort_url(
             >>> 
             >>> import unalix
             >>> 
-            >>> loop = asyncio.get_event_loop()
-            >>> 
             >>> url = "https://bitly.is/Pricing-Pop-Up'
             >>> 
-            >>> loop.run_until_complete(unalix.aunshort_url(url, context=unalix.SSL_CONTEXT_UNVERIFIED))
+            >>> asyncio.run(unalix.aunshort_url(url, context=unalix.SSL_CONTEXT_UNVERIFIED))
             'https://bitly.com/pages/pricing'
     """
 
     total_redirects = 0
     total_retries = 0
 
+    # Redirects already followed, as (URL, redirect location) pairs
+    followed_redirects = set()
+
+    # Cleaned redirect locations, as {"redirect location": "cleaned URL"} pairs
+    cleaned_urls = {}
+
     # HTTP options
     (
         http_method,
@@ -487,21 +563,26 @@ async def aunshort_url(
         max_fetch_size if max_fetch_size is not None else config.HTTP_MAX_FETCH_SIZE
     )
 
-    # SSL context for HTTPS requests
-    tls_context = (
-        context if context is not None else ssl_context.SSL_CONTEXT_VERIFIED
-    )
+    # SSL context for HTTPS requests (None means the default one, which is only created when needed)
+    tls_context = context
 
     parse_documents = (
         parse_documents and http_method != "HEAD"
     )
 
-    while True:
+    # Request headers are the same for every hop, so they are serialized only once.
+    # Each request is sent over a new connection, so keep-alive is never negotiated here.
+    raw_headers = "".join(
+        f"{key}: {value}\n" for key, value in http_headers.items() if key.lower() != "connection"
+    ) + "Connection: close\n\n"
 
-        if isinstance(url, types.URL_TYPES):
-            url = types.URL(url.geturl())
-        else:
-            url = types.URL(url)
+    # The URL is parsed only once per hop; it's reused as is when retrying
+    if isinstance(url, types.URL_TYPES):
+        url = types.URL(url.geturl())
+    else:
+        url = types.URL(url)
+
+    while True:
 
         if url.scheme == "http":
             future = asyncio.open_connection(
@@ -512,7 +593,7 @@ async def aunshort_url(
             future = asyncio.open_connection(
                 host=url.netloc,
                 port=url.port,
-                ssl=tls_context,
+                ssl=tls_context if tls_context is not None else ssl_context.get_ssl_context(),
                 ssl_handshake_timeout=ssl_handshake_timeout
             )
         else:
@@ -528,13 +609,10 @@ async def aunshort_url(
 
             raw_request = (
                 f"{http_method} {f'{url.path}?{url.query}' if url.query else (url.path if url.path else '/')} HTTP/1.0\n" +
-                f"Host: {url.netloc}\n"
+                f"Host: {url.netloc}\n" +
+                raw_headers
             )
 
-            for key, value in http_headers.items():
-                raw_request += f"{key}: {value}\n"
-            raw_request += "\n"
-
             writer.write(
                 data=raw_request.encode(encoding="latin-1")
             )
@@ -625,31 +703,29 @@ async def aunshort_url(
             redirect_location = response.headers.get("Content-Location") or response.headers.get("content-location")
 
         if redirect_location is not None:
-            # https://stackoverflow.com/a/27357138
-            utils.requote_uri(
-                redirect_location.encode(encoding="latin1").decode(encoding='utf-8')
-            )
-
+            # Resolve relative redirects (e.g. "//host/path", "/path" or "path") against the current URL
             if not redirect_location.startswith(("http://", "https://")):
-                if redirect_location.startswith("//"):
-                    # new url
-                    redirect_location = urllib.parse.urlunparse((url.scheme, redirect_location.lstrip("/"), "", "", "", ""))
-                elif redirect_location.startswith("/"):
-                    # full path
-                    redirect_location = urllib.parse.urlunparse((url.scheme, (url.netloc if url.port in (80, 443) else f"{url.netloc}:{url.port}") , redirect_location, "", "", ""))
-                else:
-                    # relative path
-                    path = os.path.join(os.path.dirname(url.path), redirect_location)
-                    redirect_location = urllib.parse.urlunparse((url.scheme, (url.netloc if url.port in (80, 443) else f"{url.netloc}:{url.port}"), path, "", "", ""))
+                redirect_location = urllib.parse.urljoin(url.geturl(), redirect_location)
 
             # Avoid redirect loops
             if redirect_location == url:
                 return url
 
+            # Following the same redirect twice means we are going in circles (e.g. A -> B -> A -> B)
+            redirect = (url, redirect_location)
+
+            if redirect in followed_redirects:
+                return url
+
+            followed_redirects.add(redirect)
+
             total_redirects += 1
 
             # Strip tracking fields from the redirect URL
-            url = url_cleaner.clear_url(url=redirect_location, **kwargs)
+            try:
+                url = cleaned_urls[redirect_location]
+            except KeyError:
+                url = cleaned_urls[redirect_location] = types.URL(url_cleaner.clear_url(url=redirect_location, **kwargs))
 
             if total_redirects > http_max_redirects:
                 raise exceptions.TooManyRedirectsError(
@@ -660,31 +736,109 @@ async def aunshort_url(
             continue
 
         if parse_documents:
-            for ruleset in body_redirects.iter():
+            extracted_url = extract_url(url=url, content=response.body)
 
-                if (ruleset.urlPattern is not None and ruleset.urlPattern.compiled.match(url) or url.netloc in ruleset.domains):
-                    for rule in ruleset.rules.iter():
-                        results = rule.compiled.search(response.body)
-                        if isinstance(results, typing.Match):
-                            break
-                    else:
-                        continue
-
-                    # Strip tracking fields from the extracted URL
-                    url = url_cleaner.clear_url(url=utils.requote_uri(html.unescape(results.group(1))), **kwargs)
+            if extracted_url is None:
+                return url
 
-                    total_redirects += 1
+            # Strip tracking fields from the extracted URL
+            url = types.URL(url_cleaner.clear_url(url=utils.requote_uri(html.unescape(extracted_url)), **kwargs))
 
-                    if total_redirects > http_max_redirects:
-                        raise exceptions.TooManyRedirectsError(
-                            message="Exceeded maximum allowed redirects",
-                            url=url
-                        ) from None
+            total_redirects += 1
 
-                    break
-            else:
-                return url
+            if total_redirects > http_max_redirects:
+                raise exceptions.TooManyRedirectsError(
+                    message="Exceeded maximum allowed redirects",
+                    url=url
+                ) from None
             
             continue
         
         return url
+
+
+def unshort_urls(
+    urls: typing.Iterable[typing.Union[str, urllib.parse.ParseResult]],
+    concurrency: typing.Optional[int] = None,
+    **kwargs: typing.Any
+) -> typing.List[str]:
+    """
+    Same as unalix.unshort_url(), but resolves multiple URLs at once. Each URL is resolved in its own thread.
+
+    Parameters:
+
+        urls (typing.Iterable):
+            List or iterable of valid RFC 3986 HTTP URIs.
+
+        concurrency (int | optional):
+            Max number of URLs to resolve at the same time. Defaults to unalix.config.HTTP_MAX_CONCURRENCY.
+
+        **kwargs (optional):
+            Optional keyword arguments that unalix.unshort_url() takes.
+
+    Returns a list with the resolved URLs, in the same order as the given ones.
+
+    Raises ValueError if concurrency is lower than 1.
+
+    Usage examples:
+
+        Resolving multiple URLs
+
+            >>> import unalix
+            >>> 
+            >>> urls = ["https://bitly.is/Pricing-Pop-Up", "https://bitly.is/Pricing-Pop-Up"]
+            >>> 
+            >>> unalix.unshort_urls(urls)
+            ['https://bitly.com/pages/pricing', 'https://bitly.com/pages/pricing']
+    """
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=get_concurrency(concurrency)) as executor:
+        futures = [executor.submit(unshort_url, url, **kwargs) for url in urls]
+
+    return [future.result() for future in futures]
+
+
+async def aunshort_urls(
+    urls: typing.Iterable[typing.Union[str, urllib.parse.ParseResult]],
+    concurrency: typing.Optional[int] = None,
+    **kwargs: typing.Any
+) -> typing.List[str]:
+    """
+    Same as unalix.aunshort_url(), but resolves multiple URLs concurrently.
+
+    Parameters:
+
+        urls (typing.Iterable):
+            List or iterable of valid RFC 3986 HTTP URIs.
+
+        concurrency (int | optional):
+            Max number of URLs to resolve at the same time. Defaults to unalix.config.HTTP_MAX_CONCURRENCY.
+
+        **kwargs (optional):
+            Optional keyword arguments that unalix.aunshort_url() takes.
+
+    Returns a list with the resolved URLs, in the same order as the given ones.
+
+    Raises ValueError if concurrency is lower than 1.
+
+    Usage examples:
+
+        Resolving multiple URLs
+
+            >>> import asyncio
+            >>> 
+            >>> import unalix
+            >>> 
+            >>> urls = ["https://bitly.is/Pricing-Pop-Up", "https://bitly.is/Pricing-Pop-Up"]
+            >>> 
+            >>> asyncio.run(unalix.aunshort_urls(urls))
+            ['https://bitly.com/pages/pricing', 'https://bitly.com/pages/pricing']
+    """
+
+    semaphore = asyncio.Semaphore(get_concurrency(concurrency))
+
+    async def limited_aunshort_url(url):
+        async with semaphore:
+            return await aunshort_url(url, **kwargs)
+
+    return list(await asyncio.gather(*(limited_aunshort_url(url) for url in urls)))
@@ -1,10 +1,59 @@
+import re
+
 from .objects import Dict, List
 
 
+class CompiledRegex:
+    """
+    Compiles the regex of a pattern on first access and caches the result as a regular instance attribute.
+
+    Most patterns are never used in a given run, so there is no point in compiling them upfront.
+    """
+
+
+    def __get__(self, instance, owner):
+
+        if instance is None:
+            return self
+
+        compiled = instance.compile()
+        instance.compiled = compiled
+
+        return compiled
+
+
 # Generic patterns
 class Pattern(str):
-    pass
+
+    compiled = CompiledRegex()
+
+
+    def __init__(self, pattern):
+
+        # The regex to compile this pattern with; it might be a modified version of the pattern itself
+        self.regex = pattern
+
+
+    def compile(self):
+
+        return re.compile(self.regex)
 
 
 class Patterns(List):
-    pass
+
+    compiled = CompiledRegex()
+
+    # A regex combining all patterns of the list, if any
+    regex = None
+
+
+    def compile(self):
+
+        if self.regex is None:
+            return None
+
+        try:
+            return re.compile(self.regex)
+        except re.error:
+            # The combined regex is just an optimization; the patterns will be used one by one instead
+            return None
@@ -1,7 +1,41 @@
+import functools
+import re
 import urllib.parse
 import ipaddress
 
 
+# The same URLs are parsed over and over again (e.g. when following redirects), so we keep the most recent results around.
+# This is safe because urllib.parse.ParseResult is immutable.
+urlparse = functools.lru_cache(maxsize=4096)(urllib.parse.urlparse)
+
+LOCAL_DOMAINS = frozenset((
+    "localhost",
+    "localhost.localdomain",
+    "ip6-localhost",
+    "ip6-loopback"
+))
+
+# Hosts that might be an IPv4 address; anything else is not worth passing to ipaddress.ip_address()
+IPV4_ADDRESS = re.compile(r"[0-9]{1,3}(?:\.[0-9]{1,3}){3}")
+
+
+@functools.lru_cache(maxsize=1024)
+def is_local_host(host: str) -> bool:
+
+    if host in LOCAL_DOMAINS:
+        return True
+
+    if not (IPV4_ADDRESS.fullmatch(host) or ":" in host):
+        return False
+
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    else:
+        return address.is_private
+
+
 class URL(str):
 
 
@@ -12,7 +46,7 @@ class URL(str):
         (
             self.scheme, self.netloc, self.path,
             self.params, self.query, self.fragment
-        ) = urllib.parse.urlparse(url)
+        ) = urlparse(url)
 
         self.port = None
 
@@ -34,19 +68,7 @@ class URL(str):
 
     def islocal(self) -> bool:
 
-        local_domains = (
-            "localhost",
-            "localhost.localdomain",
-            "ip6-localhost",
-            "ip6-loopback"
-        )
-
-        try:
-            address = ipaddress.ip_address(self.netloc)
-        except ValueError:
-            return True if self.netloc in local_domains else False
-        else:
-            return True if address.is_private else False
+        return is_local_host(self.netloc)
 
 
     def geturl(self):
@@ -68,7 +90,7 @@ class URL(str):
         (
             scheme, netloc, path,
             params, query, fragment
-        ) = urllib.parse.urlparse(self.geturl(), "http")
+        ) = urlparse(self.geturl(), "http")
 
         if not netloc:
             netloc, path = path, netloc
@@ -1,3 +1,4 @@
+import re
 import string
 import urllib.parse
 import typing
@@ -8,23 +9,43 @@ UNRESERVED_SET = frozenset(
     string.ascii_uppercase + string.ascii_lowercase + string.digits + "-._~"
 )
 
+# Percent-escape sequences of unreserved characters as {"7E": "~", "7e": "~", ...} pairs
+UNRESERVED_ESCAPES = {
+    f"{code:02{case}}": chr(code)
+    for code in range(128) if chr(code) in UNRESERVED_SET
+    for case in "xX"
+}
+
+# A "%" followed by two characters (which are not necessarily hex digits)
+PERCENT_ESCAPE = re.compile(r"%([^%]{2})")
+
+
+def _unquote_unreserved_escape(match):
+    h = match.group(1)
+
+    try:
+        return UNRESERVED_ESCAPES[h]
+    except KeyError:
+        pass
+
+    # Anything else is kept as is, but invalid escapes (e.g. "%zz") must still raise
+    # ValueError, as requote_uri() relies on it
+    if h.isalnum():
+        c = chr(int(h, 16))
+        if c in UNRESERVED_SET:
+            return c
+
+    return match.group(0)
+
+
 # https://github.com/psf/requests/blob/v2.24.0/requests/utils.py#L570
 def unquote_unreserved(uri):
     """Un-escape any percent-escape sequences in a URI that are unreserved
     characters. This leaves all reserved, illegal and non-ASCII bytes encoded.
     """
-    parts = uri.split("%")
-    for i in range(1, len(parts)):
-        h = parts[i][0:2]
-        if len(h) == 2 and h.isalnum():
-            c = chr(int(h, 16))
-            if c in UNRESERVED_SET:
-                parts[i] = c + parts[i][2:]
-            else:
-                parts[i] = "%" + parts[i]
-        else:
-            parts[i] = "%" + parts[i]
-    return "".join(parts)
+    if "%" not in uri:
+        return uri
+    return PERCENT_ESCAPE.sub(_unquote_unreserved_escape, uri)
 
 
 # https://github.com/psf/requests/blob/v2.24.0/requests/utils.py#L594